@@ -1,23 +1,437 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
+import argparse
 import json
 import csv
-from datetime import datetime
+import calendar
+from collections import deque
+import io
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+import mmap
+import multiprocessing
+from operator import itemgetter
 import os
 from pathlib import Path
+import queue
+import struct
+import sys
+import threading
+import time
 
 ctk.set_appearance_mode("Dark")  # Automatic light/dark mode
 ctk.set_default_color_theme("blue")  # Default color theme
 
+# Minutes after a class's start time before arrivals count as Late
+LATE_THRESHOLD_MINUTES = 10
+# Start time ("HH:MM") for classes without one in class_schedule.json. When neither is set,
+# the class's first check-in of the day is used and the status export marks it as a guess.
+DEFAULT_CLASS_START = None
+
+# How often a bulk roster import running in the process pool is checked for completion
+IMPORT_POLL_MS = 100
+
+# Scanner mode: how often the scan queue is drained, and how many confirmations stay on screen
+SCAN_POLL_MS = 100
+SCAN_HISTORY = 50
+
+# The only roster columns the converter uses; SIS exports may carry many more
+ROSTER_COLUMNS = ('Course', 'First Name', 'Last Name', 'Gender', 'Grade')
+# Used to tell apart students with the same name when the roster has it
+OPTIONAL_ROSTER_COLUMN = 'Middle Name'
+
+# Binary snapshot layout: header, check-in records, roster records, string offsets, UTF-8 strings.
+# Student and class ids are indexes into the string table; epochs are wall-clock seconds.
+SNAPSHOT_MAGIC = b'AAT1'
+SNAPSHOT_HEADER = struct.Struct('<4sIII')  # magic, string count, roster count, check-in count
+CHECK_IN_RECORD = struct.Struct('<IIq')  # student_id, class_id, epoch
+ROSTER_RECORD = struct.Struct('<II')  # student_id, class_id
+NO_STUDENT = 0xFFFFFFFF  # roster student_id that keeps a class with no students in the snapshot
+
+
+def read_roster_csv(input_file, appendix_value, bulk=False):
+    """Read a roster CSV into a list of student records, pulling only ROSTER_COLUMNS (and Middle Name).
+
+    Header positions are resolved once, so rows stay plain lists instead of dicts.
+    With bulk=True each line is split on commas only up to the last needed column, and
+    only lines containing quotes go through csv. A line with an unbalanced quote starts
+    a field that runs onto the next line, so the rest of the file is left to csv.
+    """
+    with open(input_file, 'r', newline='') as file:
+        rows = csv.reader(file)
+        header = next(rows, None)
+        if not header:
+            return []
+        indices = [header.index(column) for column in ROSTER_COLUMNS]
+        pick = itemgetter(*indices)
+        middle_index = header.index(OPTIONAL_ROSTER_COLUMN) if OPTIONAL_ROSTER_COLUMN in header else None
+        if middle_index is not None:
+            indices.append(middle_index)
+        if bulk:
+            rows = split_roster_lines(file, max(indices))
+
+        converted_data = []
+        for row in rows:
+            if not row or row == ['']:
+                continue
+            course, first_name, last_name, gender, grade = pick(row)
+            middle_name = row[middle_index] if middle_index is not None else ''
+            converted_data.append({'Course': course[appendix_value:].title(),
+                                   'Full Name': f"{first_name} {last_name}".title(),
+                                   'Student Key': (first_name.title(), middle_name.title(), last_name.title()),
+                                   'Gender': gender.capitalize(), 'Grade': grade, 'Check-in': []})
+    return converted_data
+
+
+def split_roster_lines(file, last):
+    """Yield bulk-mode rows, splitting only as far as column last; the rest of a wide row stays one string."""
+    for line in file:
+        if '"' not in line:
+            yield line.rstrip('\r\n').split(',', last + 1)
+        elif line.count('"') % 2 == 0:
+            yield next(csv.reader(io.StringIO(line)))
+        else:
+            # A quoted field carries on past this line; csv has to read the rest of the file
+            yield from csv.reader(chain([line], file))
+            return
+
+
+def parse_roster_file(input_file, appendix_value, bulk=False):
+    """Process pool worker: parse one roster file and time it."""
+    start = time.perf_counter()
+    rows = read_roster_csv(input_file, appendix_value, bulk)
+    return input_file, rows, time.perf_counter() - start
+
+
+def write_snapshot(data, snapshot_path):
+    """Write the class/student JSON as a fixed-width binary snapshot for read-only reporting."""
+    strings = {}
+    roster = []
+    check_ins = []
+    day_epochs = {}
+    for class_name, students in data.items():
+        class_id = strings.setdefault(class_name, len(strings))
+        if not students:
+            roster.append((NO_STUDENT, class_id))
+        for student_name, attendance in students.items():
+            student_id = strings.setdefault(student_name, len(strings))
+            roster.append((student_id, class_id))
+            for record in attendance["Check-in"]:
+                date = record['Date']
+                if date not in day_epochs:
+                    day_epochs[date] = calendar.timegm(datetime.strptime(date, "%Y-%m-%d").timetuple())
+                hours, minutes, seconds = record['Time'].split(':')
+                epoch = day_epochs[date] + int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+                check_ins.append((student_id, class_id, epoch))
+
+    encoded = [name.encode('utf-8') for name in strings]
+    offsets = [0]
+    for name in encoded:
+        offsets.append(offsets[-1] + len(name))
+
+    with open(snapshot_path, 'wb') as file:
+        file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(encoded), len(roster), len(check_ins)))
+        file.write(b''.join(CHECK_IN_RECORD.pack(*record) for record in check_ins))
+        file.write(b''.join(ROSTER_RECORD.pack(*record) for record in roster))
+        file.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        file.write(b''.join(encoded))
+    return snapshot_path
+
+
+def read_snapshot_counts(snapshot_path):
+    """Count check-ins per class and student by scanning a memory-mapped snapshot in place."""
+    with open(snapshot_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            magic, string_count, roster_count, check_in_count = SNAPSHOT_HEADER.unpack_from(view)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{snapshot_path} is not an attendance snapshot")
+            check_ins_start = SNAPSHOT_HEADER.size
+            roster_start = check_ins_start + check_in_count * CHECK_IN_RECORD.size
+            offsets_start = roster_start + roster_count * ROSTER_RECORD.size
+            strings_start = offsets_start + (string_count + 1) * 4
+            offsets = struct.unpack_from(f'<{string_count + 1}I', view, offsets_start)
+            if strings_start + offsets[-1] > len(view):
+                raise ValueError(f"{snapshot_path} is truncated")
+
+            def name(string_id):
+                return str(view[strings_start + offsets[string_id]:strings_start + offsets[string_id + 1]], 'utf-8')
+
+            logins = {}
+            for student_id, class_id, _ in CHECK_IN_RECORD.iter_unpack(view[check_ins_start:roster_start]):
+                key = (class_id, student_id)
+                logins[key] = logins.get(key, 0) + 1
+
+            counts = {}
+            for student_id, class_id in ROSTER_RECORD.iter_unpack(view[roster_start:offsets_start]):
+                students = counts.setdefault(name(class_id), {})
+                if student_id != NO_STUDENT:
+                    students[name(student_id)] = logins.get((class_id, student_id), 0)
+        finally:
+            view.release()
+    return counts
+
+
+class Registry:
+    """Stable integer ids for courses and students, persisted next to the attendance log.
+
+    Students are identified by a key: (first, middle, last) from a roster, or just (name,)
+    for names typed at check-in. Each student gets a display name that is unique across
+    the registry, so the name-keyed JSON log never merges two different students.
+    A roster without a Middle Name column is matched to the same first and last name
+    from a roster that has one; when that match is ambiguous the new entry is kept
+    apart and listed in possible_duplicates.
+    """
+
+    def __init__(self, courses=(), students=()):
+        self.course_names = []
+        self.course_ids = {}
+        self.student_keys = []
+        self.student_names = []
+        self.student_ids = {}
+        self.ids_by_name = {}
+        self.ids_by_first_last = {}
+        self.possible_duplicates = []
+        self.dirty = False
+        for name in courses:
+            self.course_id(name)
+        for student in students:
+            self.add_student(tuple(student['key']), student['name'])
+        self.dirty = False
+
+    @classmethod
+    def load(cls, file_path):
+        """Load a registry file, or start an empty registry if there is none yet."""
+        if not os.path.exists(file_path):
+            return cls()
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        return cls(data.get('courses', []), data.get('students', []))
+
+    def save(self, file_path):
+        """Write the registry to disk if anything was added since it was loaded."""
+        if self.dirty:
+            students = [{'key': list(key), 'name': name} for key, name in zip(self.student_keys, self.student_names)]
+            with open(file_path, 'w') as file:
+                json.dump({'courses': self.course_names, 'students': students}, file, indent=4)
+            self.dirty = False
+
+    def course_id(self, name):
+        """Return the id for a course name, assigning the next id if it is new."""
+        if name not in self.course_ids:
+            self.course_ids[name] = len(self.course_names)
+            self.course_names.append(name)
+            self.dirty = True
+        return self.course_ids[name]
+
+    def add_student(self, key, name):
+        """Append a student with an already chosen display name and return its id."""
+        student_id = len(self.student_keys)
+        self.student_keys.append(key)
+        self.student_names.append(name)
+        self.student_ids[key] = student_id
+        self.ids_by_name[name] = student_id
+        self.index_first_last(key, student_id)
+        self.dirty = True
+        return student_id
+
+    def index_first_last(self, key, student_id):
+        """Remember a roster key by first and last name for middle-name matching."""
+        if len(key) == 3:
+            self.ids_by_first_last.setdefault((key[0], key[2]), []).append(student_id)
+
+    def match_middle_name(self, key):
+        """Return the id of the one student that differs from a roster key only by a missing middle name."""
+        first, middle, last = key
+        candidates = [student_id for student_id in self.ids_by_first_last.get((first, last), [])
+                      if not middle or not self.student_keys[student_id][1]]
+        if len(candidates) != 1:
+            return None
+        student_id = candidates[0]
+        if middle:
+            # The earlier roster had no middle name: keep the fuller key, the old one still matches
+            self.student_keys[student_id] = key
+            self.dirty = True
+        self.student_ids[key] = student_id
+        return student_id
+
+    def student_id(self, key, full_name):
+        """Return the id for a student key, registering the student if they are new."""
+        if key in self.student_ids:
+            return self.student_ids[key]
+
+        existing_id = self.ids_by_name.get(full_name)
+        if existing_id is not None and len(self.student_keys[existing_id]) == 1 and len(key) > 1:
+            # A name typed at check-in (or from an older log) now has a roster entry: adopt it
+            del self.student_ids[self.student_keys[existing_id]]
+            self.student_keys[existing_id] = key
+            self.student_ids[key] = existing_id
+            self.index_first_last(key, existing_id)
+            self.dirty = True
+            return existing_id
+
+        if len(key) == 3:
+            matched_id = self.match_middle_name(key)
+            if matched_id is not None:
+                return matched_id
+
+        name = full_name
+        if name in self.ids_by_name and len(key) > 1 and key[1]:
+            name = f"{key[0]} {key[1][0]}. {key[2]}"
+        if name in self.ids_by_name:
+            name = f"{full_name} ({len(self.student_keys)})"
+        student_id = self.add_student(key, name)
+        if len(key) == 3 and any(not key[1] or not self.student_keys[other_id][1]
+                                 for other_id in self.ids_by_first_last[(key[0], key[2])][:-1]):
+            self.possible_duplicates.append(student_id)
+        return student_id
+
+    def student_id_for_name(self, full_name):
+        """Return the id of the student with this display name, registering it if unknown."""
+        if full_name in self.ids_by_name:
+            return self.ids_by_name[full_name]
+        return self.student_id((full_name,), full_name)
+
+
+def index_check_ins(data):
+    """Index every check-in record by (class, student, date, time)."""
+    index = {}
+    for course, students in data.items():
+        for student, details in students.items():
+            for record in details['Check-in']:
+                index.setdefault((course, student, record['Date'], record['Time']), []).append(record)
+    return index
+
+
+def apply_correction(data, index, correction):
+    """Apply one correction record to the attendance data and its index, in place.
+
+    A correction names an entry by class, student, date and time and either deletes it,
+    moves it to to_class, or retimes it to to_date/to_time. A move into a class that no
+    longer exists counts as a delete. Returns ((class, date) taken from, (class, date) put
+    in or None if deleted), or None if the entry no longer exists.
+    """
+    key = (correction['class'], correction['student'], correction['date'], correction['time'])
+    entries = index.get(key)
+    if not entries:
+        return None
+    record = entries.pop()
+    if not entries:
+        del index[key]
+    check_ins = data[key[0]][key[1]]['Check-in']
+    del check_ins[next(position for position, entry in enumerate(check_ins) if entry is record)]
+
+    course = correction['to_class'] if correction['op'] == 'move' else key[0]
+    if correction['op'] == 'delete' or course not in data:
+        return (key[0], key[2]), None
+    if correction['op'] == 'retime':
+        record['Date'], record['Time'] = correction['to_date'], correction['to_time']
+    data[course].setdefault(key[1], {'Check-in': []})['Check-in'].append(record)
+    index.setdefault((course, key[1], record['Date'], record['Time']), []).append(record)
+    return (key[0], key[2]), (course, record['Date'])
+
+
+def week_of(day):
+    """ISO year and week number for a YYYY-MM-DD date string."""
+    return date.fromisoformat(day).isocalendar()[:2]
+
+
+class AttendanceCounters:
+    """Running check-in counts per student and per class: [total, this week, today].
+
+    Students are keyed by (course_id, student_id) and classes by course_id, using registry
+    ids. The week and today columns are relative to self.day and reset by roll_over.
+    self.corrections is how many lines of the correction log the counts already include.
+    """
+
+    def __init__(self, day='', students=None, classes=None, corrections=0):
+        self.day = day
+        self.students = students if students is not None else {}
+        self.classes = classes if classes is not None else {}
+        self.corrections = corrections
+
+    @classmethod
+    def load(cls, file_path):
+        """Load saved counters, or return None if they have never been saved."""
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, 'r') as file:
+            data = json.load(file)
+        students = {tuple(int(part) for part in key.split(':')): counts for key, counts in data['students'].items()}
+        classes = {int(key): counts for key, counts in data['classes'].items()}
+        return cls(data['day'], students, classes, data.get('corrections', 0))
+
+    def save(self, file_path):
+        """Write the counters to disk."""
+        students = {f"{course_id}:{student_id}": counts for (course_id, student_id), counts in self.students.items()}
+        classes = {str(course_id): counts for course_id, counts in self.classes.items()}
+        with open(file_path, 'w') as file:
+            json.dump({'day': self.day, 'students': students, 'classes': classes, 'corrections': self.corrections}, file)
+
+    @classmethod
+    def recount(cls, data, registry, day):
+        """Build counters from scratch by counting every check-in in the attendance data."""
+        counters = cls(day)
+        for course, students in data.items():
+            course_id = registry.course_id(course)
+            counters.classes.setdefault(course_id, [0, 0, 0])
+            for student, details in students.items():
+                student_id = registry.student_id_for_name(student)
+                counters.students.setdefault((course_id, student_id), [0, 0, 0])
+                for record in details['Check-in']:
+                    counters.add(course_id, student_id, record['Date'])
+        return counters
+
+    def roll_over(self, day):
+        """Move the counters to a new day, clearing today's counts and, in a new week, the week's."""
+        if day == self.day:
+            return
+        same_week = bool(self.day) and week_of(self.day) == week_of(day)
+        for counts in [*self.students.values(), *self.classes.values()]:
+            counts[2] = 0
+            if not same_week:
+                counts[1] = 0
+        self.day = day
+
+    def add(self, course_id, student_id, day, amount=1):
+        """Count a check-in made on day (use a negative amount to take one away)."""
+        in_week = bool(self.day) and week_of(day) == week_of(self.day)
+        for counts in (self.students.setdefault((course_id, student_id), [0, 0, 0]),
+                       self.classes.setdefault(course_id, [0, 0, 0])):
+            counts[0] += amount
+            if in_week:
+                counts[1] += amount
+            if day == self.day:
+                counts[2] += amount
+
+    def drop_course(self, course_id):
+        """Forget every counter belonging to a course."""
+        self.classes.pop(course_id, None)
+        for key in [key for key in self.students if key[0] == course_id]:
+            del self.students[key]
+
+    def mismatches(self, other):
+        """List the student and class keys whose counts differ from another set of counters."""
+        keys = []
+        for mine, theirs in ((self.students, other.students), (self.classes, other.classes)):
+            keys.extend(key for key in mine.keys() | theirs.keys() if mine.get(key, [0, 0, 0]) != theirs.get(key, [0, 0, 0]))
+        return keys
+
+
 class CheckInApp(ctk.CTk):
     def __init__(self):
         super().__init__()
         self.title("Check-In System")
-        self.geometry("500x250")
+        self.geometry("500x300")
 
         # Load attendance data and classes from JSON file
         self.attendance_data = self.load_attendance_data()
+        self.registry = Registry.load(self.get_registry_file_path())
+        self.rebuild_index()
+        self.counters = self.load_counters()
         self.classes = self.load_classes_from_json()
 
         if not self.classes:
@@ -32,6 +446,7 @@ class CheckInApp(ctk.CTk):
         self.create_name_entry_dropdown()
         self.create_check_in_button()
         self.create_audit_log_button()
+        self.create_scanner_button()
         self.update_name_dropdown()  # Populate name dropdown based on the first class
 
     def create_class_selection_dropdown(self):
@@ -68,6 +483,11 @@ class CheckInApp(ctk.CTk):
         self.audit_button = ctk.CTkButton(self, text="Audit Log", command=self.audit_log)
         self.audit_button.pack(pady=(20, 0))
 
+    def create_scanner_button(self):
+        """Create the scanner mode button."""
+        self.scanner_button = ctk.CTkButton(self, text="Scanner Mode", command=self.open_scanner_window)
+        self.scanner_button.pack(pady=(10, 0))
+
     def get_data_file_path(self):
         """Get the path to the data file. Create it if it doesn't exist."""
         desktop_path = Path.home() / 'Desktop'
@@ -79,16 +499,131 @@ class CheckInApp(ctk.CTk):
                 json.dump({}, file)
         return file_path
 
+    def get_registry_file_path(self):
+        """Get the path to the course and student id registry."""
+        return self.get_data_file_path().with_name('registry.json')
+
+    def get_schedule_file_path(self):
+        """Get the path to the class start times."""
+        return self.get_data_file_path().with_name('class_schedule.json')
+
+    def load_class_schedule(self):
+        """Load the class start times as {'default': time or None, 'classes': {course: time}}."""
+        schedule = {'default': DEFAULT_CLASS_START, 'classes': {}}
+        file_path = self.get_schedule_file_path()
+        if file_path.exists():
+            with open(file_path, 'r') as file:
+                schedule.update(json.load(file))
+        return schedule
+
+    def rebuild_index(self):
+        """Register everything in the attendance data and rebuild the id-keyed class rosters."""
+        self.class_rosters = {}
+        for course, students in self.attendance_data.items():
+            course_id = self.registry.course_id(course)
+            self.class_rosters[course_id] = [self.registry.student_id_for_name(name) for name in students]
+        self.registry.save(self.get_registry_file_path())
+        # Students are only ever added to the registry, so a longer list means new ids to scan
+        if hasattr(self, 'scanner_window') and self.scanner_window.winfo_exists() \
+                and self.scan_lookup_size != len(self.registry.student_names):
+            self.scan_lookup = self.build_scan_lookup()
+
+    def get_counters_file_path(self):
+        """Get the path to the saved per-student and per-class check-in counters."""
+        return self.get_data_file_path().with_name('attendance_counters.json')
+
+    def load_counters(self):
+        """Load the saved counters, recounting from the attendance data the first time."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        counters = AttendanceCounters.load(self.get_counters_file_path())
+        if counters is None:
+            counters = AttendanceCounters.recount(self.attendance_data, self.registry, today)
+            counters.corrections = len(self.corrections)
+            counters.save(self.get_counters_file_path())
+            self.registry.save(self.get_registry_file_path())
+        counters.roll_over(today)
+        # Corrections are not saved into the counters file as they happen; catch up on them here
+        for position, result in self.replayed_corrections:
+            if position >= counters.corrections:
+                self.apply_correction_to_counters(counters, self.corrections[position]['student'], result)
+        counters.corrections = len(self.corrections)
+        return counters
+
+    def save_counters(self):
+        """Save the counters, noting that they include every correction logged so far."""
+        self.counters.corrections = len(self.corrections)
+        self.counters.save(self.get_counters_file_path())
+
+    def apply_correction_to_counters(self, counters, student, result):
+        """Move one check-in's count as described by an apply_correction result."""
+        (old_class, old_date), new_place = result
+        student_id = self.registry.student_id_for_name(student)
+        counters.add(self.registry.course_id(old_class), student_id, old_date, -1)
+        if new_place is not None:
+            new_class, new_date = new_place
+            counters.add(self.registry.course_id(new_class), student_id, new_date)
+
+    def reset_counters(self, data):
+        """Replace the counters with a full recount of the given attendance data."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        self.counters = AttendanceCounters.recount(data, self.registry, today)
+        self.save_counters()
+        self.registry.save(self.get_registry_file_path())
+
+    def register_roster(self, records):
+        """Give converted roster records registry ids and unique display names."""
+        for record in records:
+            record['Course ID'] = self.registry.course_id(record['Course'])
+            record['Student ID'] = self.registry.student_id(record['Student Key'], record['Full Name'])
+            record['Full Name'] = self.registry.student_names[record['Student ID']]
+        self.registry.save(self.get_registry_file_path())
+        return records
+
+    def get_corrections_file_path(self):
+        """Get the path to the append-only check-in correction log."""
+        return self.get_data_file_path().with_name('attendance_corrections.jsonl')
+
     def load_attendance_data(self):
-        """Load attendance data from the JSON file."""
+        """Load attendance data from the JSON file with the correction log applied on top."""
         file_path = self.get_data_file_path()
+        data = {}
         if os.path.exists(file_path):
             with open(file_path, 'r') as file:
-                return json.load(file)
-        return {}
+                data = json.load(file)
+
+        self.corrections = []
+        corrections_path = self.get_corrections_file_path()
+        if os.path.exists(corrections_path):
+            with open(corrections_path, 'r') as file:
+                self.corrections = [json.loads(line) for line in file if line.strip()]
+
+        # Corrections before the last compaction are already part of the JSON
+        compacted = max((position + 1 for position, correction in enumerate(self.corrections)
+                         if correction['op'] == 'compact'), default=0)
+        self.entry_index = index_check_ins(data)
+        self.replayed_corrections = []
+        for position in range(compacted, len(self.corrections)):
+            result = apply_correction(data, self.entry_index, self.corrections[position])
+            if result is not None:
+                self.replayed_corrections.append((position, result))
+        return data
+
+    def mark_corrections_compacted(self):
+        """Mark the correction log as folded into the attendance JSON.
+
+        Called after the whole JSON has been rewritten from corrected (or freshly converted)
+        data. Earlier corrections stay in the log for the audit trail, but only those after
+        the compact marker are replayed.
+        """
+        marker = {"op": "compact", "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        with open(self.get_corrections_file_path(), 'a') as file:
+            file.write(json.dumps(marker) + "\n")
+        self.corrections.append(marker)
 
     def refresh_app(self):
         """Refresh the application by reloading class and name lists."""
+        self.attendance_data = self.load_attendance_data()
+        self.rebuild_index()
         self.classes = self.load_classes_from_json()
 
         self.class_selection.configure(values=self.classes)
@@ -104,24 +639,13 @@ class CheckInApp(ctk.CTk):
 
     def update_name_dropdown(self, *args):
         """Update the names dropdown based on the selected class."""
-        selected_class = self.selected_class.get()
-        file_path = self.get_data_file_path()
-        try:
-            with open(file_path, 'r') as file:
-                data = json.load(file)
-            if selected_class in data:
-                names = list(data[selected_class].keys())
-            else:
-                names = []
-            self.name_dropdown.configure(values=names)
-            if names:
-                self.name_dropdown.set(names[0])
-            else:
-                self.name_dropdown.set('')
-        except FileNotFoundError:
-            messagebox.showwarning("File Not Found", "The attendance_log.json file could not be found.")
-        except json.JSONDecodeError:
-            messagebox.showwarning("JSON Error", "There was an error reading the JSON file.")
+        course_id = self.registry.course_ids.get(self.selected_class.get())
+        names = [self.registry.student_names[student_id] for student_id in self.class_rosters.get(course_id, [])]
+        self.name_dropdown.configure(values=names)
+        if names:
+            self.name_dropdown.set(names[0])
+        else:
+            self.name_dropdown.set('')
 
     def load_classes_from_json(self):
         """Load classes from the JSON file."""
@@ -149,6 +673,16 @@ class CheckInApp(ctk.CTk):
             return
 
         selected_class = self.selected_class.get()
+        course_id = self.registry.course_id(selected_class)
+        student_id = self.registry.student_id_for_name(full_name)
+        full_name = self.registry.student_names[student_id]
+        self.record_check_ins([(course_id, student_id)])
+
+        messagebox.showinfo("Success", f"{full_name} has successfully checked in for {selected_class}.")
+        self.name_entry.delete(0, tk.END)
+
+    def record_check_ins(self, check_ins):
+        """Save a batch of (course_id, student_id) check-ins with one read and one write of the log."""
         date_str = datetime.now().strftime("%Y-%m-%d")
         time_str = datetime.now().strftime("%H:%M:%S")
 
@@ -159,26 +693,153 @@ class CheckInApp(ctk.CTk):
         else:
             data = {}
 
-        if selected_class not in data:
-            data[selected_class] = {}
-        if full_name not in data[selected_class]:
-            data[selected_class][full_name] = {"Check-in": []}
-
-        data[selected_class][full_name]["Check-in"].append({"Date": date_str, "Time": time_str})
+        self.counters.roll_over(date_str)
+        for course_id, student_id in check_ins:
+            selected_class = self.registry.course_names[course_id]
+            full_name = self.registry.student_names[student_id]
+            if selected_class not in data:
+                data[selected_class] = {}
+            if full_name not in data[selected_class]:
+                data[selected_class][full_name] = {"Check-in": []}
+
+            record = {"Date": date_str, "Time": time_str}
+            data[selected_class][full_name]["Check-in"].append(record)
+            # The file holds the uncorrected log, so mirror the entry into the corrected view
+            self.attendance_data.setdefault(selected_class, {}).setdefault(full_name, {"Check-in": []})["Check-in"].append(record)
+            self.entry_index.setdefault((selected_class, full_name, date_str, time_str), []).append(record)
+            self.counters.add(course_id, student_id, date_str)
 
         with open(file_path, "w") as file:
             json.dump(data, file, indent=4)
+        self.save_counters()
 
-        messagebox.showinfo("Success", f"{full_name} has successfully checked in for {selected_class}.")
-        self.name_entry.delete(0, tk.END)
-        self.attendance_data = self.load_attendance_data()
+        self.rebuild_index()
         self.update_audit_log()
+        return date_str, time_str
+
+    def open_scanner_window(self, source=None):
+        """Open scanner mode: check students in from a stream of ids without any dialogs.
+
+        Ids come from a keyboard-wedge scanner typing into the entry box, or from a file or
+        pipe read on a background thread. Either way they go through self.scan_queue and are
+        checked in together every SCAN_POLL_MS into the class selected when the window opened.
+        """
+        if not hasattr(self, 'scanner_window') or not self.scanner_window.winfo_exists():
+            self.scan_course_id = self.registry.course_id(self.selected_class.get())
+            self.scan_lookup = self.build_scan_lookup()
+            self.scan_queue = queue.Queue()
+            self.scan_history = deque(maxlen=SCAN_HISTORY)
+
+            self.scanner_window = ctk.CTkToplevel(self)
+            self.scanner_window.title("Scanner Mode")
+            self.scanner_window.geometry("500x500")
+
+            class_name = self.registry.course_names[self.scan_course_id]
+            scan_label = ctk.CTkLabel(self.scanner_window, text=f"Scan ID cards to check in to {class_name}:")
+            scan_label.pack(pady=(10, 0))
+            self.scan_entry = ctk.CTkEntry(self.scanner_window, width=300)
+            self.scan_entry.pack(pady=5)
+            self.scan_entry.bind('<Return>', self.queue_scan_entry)
+            self.scan_entry.focus_set()
+
+            scan_file_button = ctk.CTkButton(self.scanner_window, text="Read IDs from File", command=self.select_scan_file)
+            scan_file_button.pack(pady=(5, 0))
+
+            self.scan_results = scrolledtext.ScrolledText(self.scanner_window, width=60, height=20)
+            self.scan_results.pack(pady=10)
+
+            # A window closed and reopened within one poll would otherwise leave two polling chains
+            if hasattr(self, 'scan_poll_id'):
+                self.after_cancel(self.scan_poll_id)
+            self.scan_poll_id = self.after(SCAN_POLL_MS, self.process_scan_queue)
+
+        if source:
+            self.start_scan_reader(source)
+
+    def build_scan_lookup(self):
+        """Map every scannable token (registry id or lower-case display name) to a student id."""
+        self.scan_lookup_size = len(self.registry.student_names)
+        lookup = {name.lower(): student_id for student_id, name in enumerate(self.registry.student_names)}
+        lookup.update((str(student_id), student_id) for student_id in range(len(self.registry.student_names)))
+        return lookup
+
+    def queue_scan_entry(self, event=None):
+        """Queue whatever the scanner typed into the entry box."""
+        token = self.scan_entry.get().strip()
+        self.scan_entry.delete(0, tk.END)
+        if token:
+            self.scan_queue.put(token)
+
+    def select_scan_file(self):
+        """Select a file of student ids, one per line, to feed into scanner mode."""
+        file_path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if file_path:
+            self.start_scan_reader(file_path)
+
+    def start_scan_reader(self, source):
+        """Read ids from a file, pipe, or stdin ('-') into the scan queue on a background thread.
+
+        Errors are queued as ('error', message) so they show in the confirmation list.
+        """
+        def read_ids(lines):
+            for line in lines:
+                if line.strip():
+                    self.scan_queue.put(line.strip())
+
+        def read_source():
+            try:
+                if source == '-':
+                    if sys.stdin is None:
+                        raise OSError("there is no standard input to read from")
+                    read_ids(sys.stdin)
+                else:
+                    with open(source, 'r') as file:
+                        read_ids(file)
+            except (OSError, ValueError) as error:
+                self.scan_queue.put(('error', f"{source}: {error}"))
+
+        threading.Thread(target=read_source, daemon=True).start()
+
+    def process_scan_queue(self):
+        """Check in everything scanned since the last poll and update the rolling confirmation list."""
+        if not self.scanner_window.winfo_exists():
+            return
+        # Schedule the next poll first so one failed batch cannot stop scanning
+        self.scan_poll_id = self.after(SCAN_POLL_MS, self.process_scan_queue)
+
+        check_ins = []
+        unknown = []
+        errors = []
+        while True:
+            try:
+                token = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(token, tuple):
+                errors.append(token[1])
+                continue
+            student_id = self.scan_lookup.get(token.lower())
+            if student_id is None:
+                unknown.append(token)
+            else:
+                check_ins.append((self.scan_course_id, student_id))
+
+        if check_ins or unknown or errors:
+            if check_ins:
+                date_str, time_str = self.record_check_ins(check_ins)
+                class_name = self.registry.course_names[self.scan_course_id]
+                self.scan_history.extend(f"{time_str}  {self.registry.student_names[student_id]} checked in for {class_name}"
+                                         for _, student_id in check_ins)
+            self.scan_history.extend(f"Unknown ID: {token}" for token in unknown)
+            self.scan_history.extend(f"Scanner input error: {message}" for message in errors)
+            self.scan_results.delete('1.0', 'end')
+            self.scan_results.insert('end', '\n'.join(reversed(self.scan_history)))
 
     def open_management_window(self):
         """Open the class management window."""
         management_window = ctk.CTkToplevel(self)
         management_window.title("Class Management & Export")
-        management_window.geometry("400x400")
+        management_window.geometry("400x760")
 
         self.create_management_widgets(management_window)
 
@@ -205,6 +866,40 @@ class CheckInApp(ctk.CTk):
         csv_conversion_button = ctk.CTkButton(window, text="Convert CSV to JSON", command=self.select_file)
         csv_conversion_button.pack(pady=(10, 0))
 
+        # Bulk CSV Conversion Buttons
+        bulk_frame = ctk.CTkFrame(window)
+        bulk_frame.pack(pady=(10, 0))
+        bulk_files_button = ctk.CTkButton(bulk_frame, text="Bulk Convert Files", command=self.select_files)
+        bulk_folder_button = ctk.CTkButton(bulk_frame, text="Bulk Convert Folder", command=lambda: self.select_files(folder=True))
+        bulk_files_button.pack(side="left", padx=5)
+        bulk_folder_button.pack(side="left", padx=5)
+        self.fast_parsing = tk.BooleanVar(value=False)
+        fast_parsing_checkbox = ctk.CTkCheckBox(window, text="Fast parsing for very large files", variable=self.fast_parsing)
+        fast_parsing_checkbox.pack(pady=(5, 0))
+
+        # Archive Export and Archived Snapshot Report Buttons
+        archive_export_button = ctk.CTkButton(window, text="Export Statuses & Archive", command=self.export_archive)
+        archive_export_button.pack(pady=(10, 0))
+        archive_report_button = ctk.CTkButton(window, text="Report from Archive", command=self.select_snapshot)
+        archive_report_button.pack(pady=(10, 0))
+
+        # Class Start Time Widgets
+        start_time_label = ctk.CTkLabel(window, text="Class Start Time (HH:MM, blank to clear):")
+        start_time_label.pack(pady=(10, 0))
+        start_time_frame = ctk.CTkFrame(window)
+        start_time_frame.pack(pady=5)
+        self.start_time_class = ctk.CTkComboBox(start_time_frame, values=["All Classes", *self.classes], width=180)
+        self.start_time_class.set("All Classes")
+        self.start_time_class.pack(side="left", padx=5)
+        self.start_time_entry = ctk.CTkEntry(start_time_frame, width=80)
+        self.start_time_entry.pack(side="left", padx=5)
+        start_time_button = ctk.CTkButton(window, text="Set Start Time", command=self.set_class_start)
+        start_time_button.pack(pady=(5, 0))
+
+        # Counter Verification Button
+        verify_counters_button = ctk.CTkButton(window, text="Verify Counters", command=self.verify_counters)
+        verify_counters_button.pack(pady=(10, 0))
+
         # Course Appendix Slider
         self.course_appendix_label = ctk.CTkLabel(window, text="Append MHS = 7")
         self.course_appendix_label.pack(pady=(10, 0))
@@ -215,6 +910,28 @@ class CheckInApp(ctk.CTk):
         self.slider_value_label.pack()
         self.update_slider_value_label()
 
+    def set_class_start(self):
+        """Save the start time for the selected class, or the default for all classes."""
+        course = self.start_time_class.get()
+        start = self.start_time_entry.get().strip()
+        if start:
+            try:
+                start = datetime.strptime(start, "%H:%M").strftime("%H:%M")
+            except ValueError:
+                messagebox.showwarning("Warning", "Enter the start time as HH:MM, e.g. 08:30.")
+                return
+
+        schedule = self.load_class_schedule()
+        if course == "All Classes":
+            schedule['default'] = start or None
+        elif start:
+            schedule['classes'][course] = start
+        else:
+            schedule['classes'].pop(course, None)
+        with open(self.get_schedule_file_path(), 'w') as file:
+            json.dump(schedule, file, indent=4)
+        messagebox.showinfo("Success", f"Start time for {course} {'set to ' + start if start else 'cleared'}.")
+
     def update_slider_value_label(self):
         """Update the label with the current value of the slider."""
         current_value = self.course_appendix_slider.get()
@@ -223,32 +940,145 @@ class CheckInApp(ctk.CTk):
 
     def convert_csv(self, input_file):
         """Convert a CSV file to a dictionary."""
-        converted_data = []
         appendix_value = int(self.course_appendix_slider.get())
-        with open(input_file, 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                course = row['Course'][appendix_value:].title()
-                student = f"{row['First Name']} {row['Last Name']}".title()
-                gender = row['Gender'].capitalize()
-                grade = row['Grade']
-                converted_data.append({'Course': course, 'Full Name': student, 'Gender': gender, 'Grade': grade, 'Check-in': []})
-        return converted_data
-
-    def save_csv(self, data):
-        """Save data to a CSV file."""
+        return self.register_roster(read_roster_csv(input_file, appendix_value))
+
+    def convert_csv_files(self, input_files, on_done, bulk=False):
+        """Convert several roster CSVs in parallel without blocking the UI.
+
+        Files are parsed in a process pool that is polled every IMPORT_POLL_MS; once all
+        are done, on_done is called on the UI thread with the merged roster results.
+        bulk turns on read_roster_csv's fast line-splitting mode.
+        """
+        appendix_value = int(self.course_appendix_slider.get())
+        workers = min(len(input_files), os.cpu_count() or 1)
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = [pool.submit(parse_roster_file, input_file, appendix_value, bulk) for input_file in input_files]
+        self.after(IMPORT_POLL_MS, self.poll_csv_files, pool, futures, on_done)
+
+    def poll_csv_files(self, pool, futures, on_done):
+        """Wait for a bulk import's process pool without blocking, then merge its results."""
+        if not all(future.done() for future in futures):
+            self.after(IMPORT_POLL_MS, self.poll_csv_files, pool, futures, on_done)
+            return
+
+        pool.shutdown()
+        try:
+            results = [future.result() for future in futures]
+        except (OSError, ValueError, IndexError, csv.Error, BrokenProcessPool) as error:
+            messagebox.showerror("Conversion Failed", f"A CSV file could not be converted:\n{error}")
+            return
+        on_done(*self.merge_roster_files(results))
+
+    def merge_roster_files(self, results):
+        """Merge parsed roster files into one roster.
+
+        Returns the merged records, a list of (student, course, first file, other file)
+        for students who appear in the same course in more than one file, and a
+        throughput line per file.
+        """
+        merged = []
+        duplicates = []
+        throughput = []
+        first_seen = {}
+        for input_file, rows, elapsed in results:
+            rate = len(rows) / elapsed if elapsed else float('inf')
+            throughput.append(f"{os.path.basename(input_file)}: {len(rows)} rows in {elapsed:.3f}s ({rate:,.0f} rows/s)")
+            print(throughput[-1])
+            for record in self.register_roster(rows):
+                key = (record['Course ID'], record['Student ID'])
+                if key not in first_seen:
+                    first_seen[key] = input_file
+                    merged.append(record)
+                elif first_seen[key] != input_file:
+                    duplicates.append((record['Full Name'], record['Course'], first_seen[key], input_file))
+        return merged, duplicates, throughput
+
+    def save_csv(self, data, statuses=None, file_name="converted_attendance_export.csv", starts=None):
+        """Save data to a CSV file, with one row per class day when statuses are given."""
         desktop_path = os.path.join(os.path.expanduser('~'), 'Desktop')
         folder_path = os.path.join(desktop_path, 'DataAT2')
         os.makedirs(folder_path, exist_ok=True)
-        file_name = "converted_attendance_export.csv"
         file_path = os.path.join(folder_path, file_name)
         with open(file_path, 'w', newline='') as file:
             writer = csv.writer(file)
-            writer.writerow(["Course", "Student", "Gender", "Grade", "Date", "Status"])
+            writer.writerow(["Course", "Student", "Gender", "Grade", "Date", "Status"] + (["Class Start"] if starts is not None else []))
             for item in data:
-                writer.writerow([item['Course'], item['Full Name'], item['Gender'], item['Grade'], '', ''])
+                days = statuses.get(item['Course'], {}) if statuses else {}
+                course_starts = starts.get(item['Course'], {}) if starts else {}
+                if not days:
+                    writer.writerow([item['Course'], item['Full Name'], item['Gender'], item['Grade'], '', ''])
+                for date in sorted(days):
+                    status = days[date].get(item['Full Name'], '')
+                    row = [item['Course'], item['Full Name'], item['Gender'], item['Grade'], date, status]
+                    if starts is not None:
+                        row.append(course_starts.get(date, ''))
+                    writer.writerow(row)
         return file_path
 
+    def roster_from_json(self, data):
+        """Flatten the class/student JSON back into roster records for save_csv.
+
+        Gender and Grade are taken from the last converted roster export where it lists the student.
+        """
+        details = {}
+        roster_path = os.path.join(os.path.expanduser('~'), 'Desktop', 'DataAT2', "converted_attendance_export.csv")
+        if os.path.exists(roster_path):
+            with open(roster_path, 'r', newline='') as file:
+                for row in csv.DictReader(file):
+                    details[(row['Course'], row['Student'])] = (row['Gender'], row['Grade'])
+
+        roster = []
+        for course, students in data.items():
+            for full_name in students:
+                gender, grade = details.get((course, full_name), ('', ''))
+                roster.append({'Course': course, 'Full Name': full_name, 'Gender': gender, 'Grade': grade})
+        return roster
+
+    def compute_attendance_status(self, data, schedule=None, late_minutes=LATE_THRESHOLD_MINUTES):
+        """Work out Present/Absent/Late for every rostered student on every day a class met.
+
+        Returns {course: {date: {student: status}}} and {course: {date: start}}. A class is
+        taken to have met on any day with at least one check-in. Late is measured from the
+        class's start time in the schedule, or the schedule default; without either the
+        earliest check-in that day is used and its start is labelled "(first check-in)".
+        """
+        schedule = schedule or {'default': DEFAULT_CLASS_START, 'classes': {}}
+        statuses = {}
+        starts = {}
+        late_delta = timedelta(minutes=late_minutes)
+        for course, students in data.items():
+            scheduled_start = schedule['classes'].get(course) or schedule['default']
+            roster = set(students)
+            arrivals_by_day = {}
+            for student, details in students.items():
+                for record in details['Check-in']:
+                    arrivals = arrivals_by_day.setdefault(record['Date'], {})
+                    if student not in arrivals or record['Time'] < arrivals[student]:
+                        arrivals[student] = record['Time']
+
+            course_statuses = {}
+            course_starts = {}
+            for date, arrivals in arrivals_by_day.items():
+                if scheduled_start:
+                    start = datetime.strptime(scheduled_start, "%H:%M")
+                    course_starts[date] = start.strftime("%H:%M:%S")
+                else:
+                    start = datetime.strptime(min(arrivals.values()), "%H:%M:%S")
+                    course_starts[date] = f"{start.strftime('%H:%M:%S')} (first check-in)"
+                cutoff = min(start + late_delta, start.replace(hour=23, minute=59, second=59))
+                cutoff_str = cutoff.strftime("%H:%M:%S")
+
+                present = set(arrivals)
+                late = {student for student, time in arrivals.items() if time > cutoff_str}
+                day_statuses = dict.fromkeys(present - late, "Present")
+                day_statuses.update(dict.fromkeys(late, "Late"))
+                day_statuses.update(dict.fromkeys(roster - present, "Absent"))
+                course_statuses[date] = day_statuses
+            statuses[course] = course_statuses
+            starts[course] = course_starts
+        return statuses, starts
+
     def convert_to_json(self, data):
         """Convert a list of dictionaries to a nested JSON structure."""
         json_data = {}
@@ -280,7 +1110,57 @@ class CheckInApp(ctk.CTk):
             saved_file_path_csv = self.save_csv(converted_data)
             json_data = self.convert_to_json(converted_data)
             saved_file_path_json = self.save_json(json_data)
-            messagebox.showinfo("Conversion Successful", f"CSV file converted and saved to:\n{saved_file_path_csv}\n\nJSON file saved to:\n{saved_file_path_json}")
+            self.mark_corrections_compacted()
+            self.reset_counters(json_data)
+            self.refresh_app()
+            message = f"CSV file converted and saved to:\n{saved_file_path_csv}\n\nJSON file saved to:\n{saved_file_path_json}"
+            messagebox.showinfo("Conversion Successful", message + self.possible_duplicates_message())
+
+    def select_files(self, folder=False):
+        """Select several CSV files, or a folder of them, for a merged bulk conversion."""
+        if folder:
+            directory = filedialog.askdirectory()
+            file_paths = sorted(str(path) for path in Path(directory).glob("*.csv")) if directory else []
+        else:
+            file_paths = list(filedialog.askopenfilenames(filetypes=[("CSV files", "*.csv")]))
+        if not file_paths:
+            return
+
+        self.convert_csv_files(file_paths, lambda *merged: self.finish_select_files(file_paths, *merged),
+                               bulk=self.fast_parsing.get())
+
+    def finish_select_files(self, file_paths, converted_data, duplicates, throughput):
+        """Save a merged bulk conversion once the background import has finished."""
+        saved_file_path_csv = self.save_csv(converted_data)
+        json_data = self.convert_to_json(converted_data)
+        saved_file_path_json = self.save_json(json_data)
+        self.mark_corrections_compacted()
+        self.reset_counters(json_data)
+        self.refresh_app()
+
+        message = f"{len(file_paths)} CSV files converted and saved to:\n{saved_file_path_csv}\n\nJSON file saved to:\n{saved_file_path_json}"
+        message += "\n\n" + "\n".join(throughput)
+        if duplicates:
+            message += f"\n\n{len(duplicates)} duplicate students were merged:\n"
+            message += "\n".join(f"{name} ({course}) in {os.path.basename(first)} and {os.path.basename(other)}"
+                                 for name, course, first, other in duplicates[:10])
+        message += self.possible_duplicates_message()
+        messagebox.showinfo("Bulk Conversion Successful", message)
+
+    def possible_duplicates_message(self):
+        """Describe students the registry could not safely match by middle name, then clear the list."""
+        registry = self.registry
+        if not registry.possible_duplicates:
+            return ""
+        lines = []
+        for student_id in registry.possible_duplicates[:10]:
+            first, _, last = registry.student_keys[student_id]
+            others = [registry.student_names[other_id] for other_id in registry.ids_by_first_last[(first, last)]
+                      if other_id != student_id]
+            lines.append(f"{registry.student_names[student_id]} may be the same as {', '.join(others)}")
+        message = f"\n\n{len(registry.possible_duplicates)} possible duplicate students were kept apart:\n" + "\n".join(lines)
+        registry.possible_duplicates.clear()
+        return message
 
     def add_custom_class(self):
         """Add a new class to the list of classes."""
@@ -289,6 +1169,7 @@ class CheckInApp(ctk.CTk):
             self.classes.append(new_class)
             self.class_selection.configure(values=self.classes)
             self.remove_class_dropdown.configure(values=self.classes)
+            self.start_time_class.configure(values=["All Classes", *self.classes])
             messagebox.showinfo("Success", f"Class '{new_class}' added.")
             self.add_class_entry.delete(0, tk.END)
         else:
@@ -301,16 +1182,21 @@ class CheckInApp(ctk.CTk):
             self.classes.remove(class_to_remove)
             self.class_selection.configure(values=self.classes)
             self.remove_class_dropdown.configure(values=self.classes)
+            self.start_time_class.configure(values=["All Classes", *self.classes])
 
-            file_path = self.get_data_file_path()
-            with open(file_path, "r") as file:
-                data = json.load(file)
-
+            # Remove from the corrected view, so entries moved in from other classes go with it
+            # and entries moved out of it stay where they were moved to
+            data = self.attendance_data
             if class_to_remove in data:
                 del data[class_to_remove]
 
-                with open(file_path, "w") as file:
+                with open(self.get_data_file_path(), "w") as file:
                     json.dump(data, file, indent=4)
+                self.mark_corrections_compacted()
+
+            if class_to_remove in self.registry.course_ids:
+                self.counters.drop_course(self.registry.course_ids[class_to_remove])
+                self.save_counters()
 
             self.refresh_app()
             messagebox.showinfo("Success", f"Class '{class_to_remove}' removed.")
@@ -318,29 +1204,189 @@ class CheckInApp(ctk.CTk):
             messagebox.showwarning("Warning", "Please select a valid class to remove.")
 
     def export_data(self):
-        """Export attendance data to a text file."""
+        """Export the attendance report from the running counters."""
+        file_path = self.get_data_file_path()
+        self.generate_counter_report(file_path.with_suffix('.txt'))
+
+    def export_archive(self):
+        """Export the per-day status CSV and a binary snapshot; both take a full pass over the data."""
         file_path = self.get_data_file_path()
-        self.generate_report(file_path, file_path.with_suffix('.txt'))
+        data = self.attendance_data
+        statuses, starts = self.compute_attendance_status(data, self.load_class_schedule())
+        status_path = self.save_csv(self.roster_from_json(data), statuses, "attendance_status_export.csv", starts)
+        snapshot_path = write_snapshot(data, file_path.with_suffix('.bin'))
+        messagebox.showinfo("Export Successful", f"Statuses saved to:\n{status_path}\n\nSnapshot saved to:\n{snapshot_path}")
+
+    def generate_counter_report(self, output_file):
+        """Generate the attendance report straight from the running counters."""
+        self.counters.roll_over(datetime.now().strftime("%Y-%m-%d"))
+        with open(output_file, "w") as report:
+            for course_id, roster in self.class_rosters.items():
+                total, week, today = self.counters.classes.get(course_id, [0, 0, 0])
+                report.write(f"Class: {self.registry.course_names[course_id]} ({total} logins, {week} this week, {today} today)\n")
+                for student_id in roster:
+                    total, week, today = self.counters.students.get((course_id, student_id), [0, 0, 0])
+                    report.write(f"{self.registry.student_names[student_id]}: {total} logins ({week} this week, {today} today)\n")
+                report.write("\n")
+
+        messagebox.showinfo("Report Generated", "The report has been successfully generated.")
+
+    def verify_counters(self):
+        """Check the running counters against a full recount, and repair them if they differ."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        self.counters.roll_over(today)
+        recounted = AttendanceCounters.recount(self.attendance_data, self.registry, today)
+        mismatches = self.counters.mismatches(recounted)
+        if mismatches:
+            self.reset_counters(self.attendance_data)
+            messagebox.showwarning("Counters Repaired", f"{len(mismatches)} counters did not match a full recount and have been rebuilt.")
+        else:
+            messagebox.showinfo("Counters Verified", "All counters match a full recount.")
+
+    def select_snapshot(self):
+        """Select an archived snapshot and generate its report next to it."""
+        file_path = filedialog.askopenfilename(filetypes=[("Attendance snapshots", "*.bin")])
+        if file_path:
+            file_path = Path(file_path)
+            self.generate_report(file_path, file_path.with_suffix('.txt'))
 
     def generate_report(self, file_path, output_file):
-        """Generate a report of attendance data."""
+        """Generate a report of attendance data from a binary snapshot."""
         if not os.path.exists(file_path):
             messagebox.showerror("Error", "File does not exist.")
             return
 
-        with open(file_path, "r") as file:
-            data = json.load(file)
+        try:
+            counts = read_snapshot_counts(file_path)
+        except (ValueError, IndexError, struct.error) as error:
+            messagebox.showerror("Error", f"The snapshot could not be read; it may be empty, truncated or not a snapshot:\n{error}")
+            return
 
         with open(output_file, "w") as report:
-            for class_name, students in data.items():
+            for class_name, students in counts.items():
                 report.write(f"Class: {class_name}\n")
-                for student_name, attendance in students.items():
-                    num_logins = len(attendance["Check-in"])
+                for student_name, num_logins in students.items():
                     report.write(f"{student_name}: {num_logins} logins\n")
                 report.write("\n")
 
         messagebox.showinfo("Report Generated", "The report has been successfully generated.")
 
+    def open_corrections_window(self):
+        """Open the window for deleting, moving or retiming a single check-in."""
+        corrections_window = ctk.CTkToplevel(self)
+        corrections_window.title("Check-In Corrections")
+        corrections_window.geometry("500x650")
+
+        entry_label = ctk.CTkLabel(corrections_window, text="Check-in to correct (class, student, date, time):")
+        entry_label.pack(pady=(10, 0))
+        self.correction_class = ctk.CTkComboBox(corrections_window, values=self.classes, width=300)
+        self.correction_class.pack(pady=5)
+        self.correction_student = ctk.CTkEntry(corrections_window, width=300, placeholder_text="Student name")
+        self.correction_student.pack(pady=5)
+        self.correction_date = ctk.CTkEntry(corrections_window, width=300, placeholder_text="YYYY-MM-DD")
+        self.correction_date.pack(pady=5)
+        self.correction_time = ctk.CTkEntry(corrections_window, width=300, placeholder_text="HH:MM:SS")
+        self.correction_time.pack(pady=5)
+
+        change_label = ctk.CTkLabel(corrections_window, text="Correction (new class for Move, new date and time for Change Time):")
+        change_label.pack(pady=(10, 0))
+        self.correction_op = ctk.CTkComboBox(corrections_window, values=["Delete", "Move", "Change Time"], width=300)
+        self.correction_op.set("Delete")
+        self.correction_op.pack(pady=5)
+        self.correction_to_class = ctk.CTkComboBox(corrections_window, values=self.classes, width=300)
+        self.correction_to_class.pack(pady=5)
+        self.correction_to_date = ctk.CTkEntry(corrections_window, width=300, placeholder_text="New YYYY-MM-DD")
+        self.correction_to_date.pack(pady=5)
+        self.correction_to_time = ctk.CTkEntry(corrections_window, width=300, placeholder_text="New HH:MM:SS")
+        self.correction_to_time.pack(pady=5)
+
+        apply_button = ctk.CTkButton(corrections_window, text="Apply Correction", command=self.submit_correction)
+        apply_button.pack(pady=(10, 0))
+
+        self.corrections_area = scrolledtext.ScrolledText(corrections_window, width=60, height=12)
+        self.corrections_area.pack(pady=10)
+        self.update_corrections_area()
+
+    def submit_correction(self):
+        """Build a correction from the corrections window fields and apply it."""
+        ops = {"Delete": "delete", "Move": "move", "Change Time": "retime"}
+        correction = {
+            "op": ops.get(self.correction_op.get()),
+            "class": self.correction_class.get(),
+            "student": self.correction_student.get().strip().title(),
+            "date": self.correction_date.get().strip(),
+            "time": self.correction_time.get().strip(),
+        }
+        if correction["op"] is None:
+            messagebox.showwarning("Warning", "Please choose Delete, Move or Change Time.")
+            return
+        if correction["op"] == "move":
+            correction["to_class"] = self.correction_to_class.get()
+            if correction["to_class"] not in self.attendance_data:
+                messagebox.showwarning("Warning", "Please select a class that has check-ins to move the entry to.")
+                return
+        elif correction["op"] == "retime":
+            correction["to_date"] = self.correction_to_date.get().strip()
+            correction["to_time"] = self.correction_to_time.get().strip()
+            try:
+                datetime.strptime(f"{correction['to_date']} {correction['to_time']}", "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                messagebox.showwarning("Warning", "Please enter the new date as YYYY-MM-DD and time as HH:MM:SS.")
+                return
+
+        if self.correct_check_in(correction):
+            self.update_corrections_area()
+        else:
+            messagebox.showwarning("Not Found", "No check-in matches that class, student, date and time.")
+
+    def correct_check_in(self, correction):
+        """Apply a correction to the in-memory data and append it to the correction log.
+
+        The only file written is the one appended line. The correction is replayed over the
+        JSON whenever the data is loaded, and the counters catch up on it from the log when
+        they are loaded. Returns False if no check-in matched.
+        """
+        result = apply_correction(self.attendance_data, self.entry_index, correction)
+        if result is None:
+            return False
+
+        correction = dict(correction, at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        with open(self.get_corrections_file_path(), 'a') as file:
+            file.write(json.dumps(correction) + "\n")
+        self.corrections.append(correction)
+
+        self.counters.roll_over(datetime.now().strftime("%Y-%m-%d"))
+        self.apply_correction_to_counters(self.counters, correction['student'], result)
+        self.counters.corrections = len(self.corrections)
+
+        # A moved entry can add the student to the target class roster
+        new_place = result[1]
+        if new_place is not None:
+            roster = self.class_rosters.setdefault(self.registry.course_id(new_place[0]), [])
+            student_id = self.registry.student_id_for_name(correction['student'])
+            if student_id not in roster:
+                roster.append(student_id)
+        self.update_audit_log()
+        return True
+
+    def update_corrections_area(self):
+        """Show the correction history, newest first."""
+        self.corrections_area.delete('1.0', 'end')
+        lines = []
+        for correction in reversed(self.corrections):
+            if correction['op'] == 'compact':
+                lines.append(f"{correction['at']}: earlier corrections saved into the attendance log")
+                continue
+            entry = f"{correction['student']} ({correction['class']}) {correction['date']} {correction['time']}"
+            if correction['op'] == 'delete':
+                change = "deleted"
+            elif correction['op'] == 'move':
+                change = f"moved to {correction['to_class']}"
+            else:
+                change = f"changed to {correction['to_date']} {correction['to_time']}"
+            lines.append(f"{correction['at']}: {entry} {change}")
+        self.corrections_area.insert('end', '\n'.join(lines) if lines else "No corrections yet.")
+
     def audit_log(self):
         """Open the audit log window to display today's check-ins."""
         if not hasattr(self, 'audit_window') or not self.audit_window.winfo_exists():
@@ -354,10 +1400,12 @@ class CheckInApp(ctk.CTk):
             button1 = ctk.CTkButton(button_frame, text="Export Data", command=self.export_data)
             button2 = ctk.CTkButton(button_frame, text="Refresh", command=self.refresh_app)
             button3 = ctk.CTkButton(button_frame, text="Management", command=self.open_management_window)
+            button4 = ctk.CTkButton(button_frame, text="Corrections", command=self.open_corrections_window)
 
             button1.pack(side="left", padx=10)
             button2.pack(side="left", padx=10)
             button3.pack(side="left", padx=10)
+            button4.pack(side="left", padx=10)
 
             sort_frame = ctk.CTkFrame(self.audit_window)
             sort_frame.pack(pady=10)
@@ -379,35 +1427,48 @@ class CheckInApp(ctk.CTk):
 
     def update_audit_log(self, sort_key="date_time_desc"):
         """Update the audit log display based on the selected sort key."""
-        if self.result_area:
+        if hasattr(self, 'audit_window') and self.audit_window.winfo_exists():
             self.result_area.delete('1.0', 'end')
             today = datetime.now().strftime("%Y-%m-%d")
             check_in_entries = []
 
+            course_names = self.registry.course_names
+            student_names = self.registry.student_names
+
             for course, students in self.attendance_data.items():
+                course_id = self.registry.course_ids[course]
                 for student, details in students.items():
+                    student_id = self.registry.ids_by_name[student]
                     for record in details['Check-in']:
                         if record['Date'] == today:
                             time = record['Time']
-                            check_in_entries.append((today, time, student, course))
+                            check_in_entries.append((today, time, student_id, course_id))
 
             if sort_key == "date_time_desc":
                 check_in_entries.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
             elif sort_key == "date_time_asc":
                 check_in_entries.sort(key=lambda entry: (entry[0], entry[1]))
             elif sort_key == "student_name":
-                check_in_entries.sort(key=lambda entry: entry[2])
+                check_in_entries.sort(key=lambda entry: student_names[entry[2]])
             elif sort_key == "course":
-                check_in_entries.sort(key=lambda entry: entry[3])
+                check_in_entries.sort(key=lambda entry: course_names[entry[3]])
 
-            output_text = [f"{entry[2]} ({entry[3]}) - Checked in on {entry[0]} at {entry[1]}\n" for entry in check_in_entries]
+            output_text = [f"{student_names[entry[2]]} ({course_names[entry[3]]}) - Checked in on {entry[0]} at {entry[1]}\n"
+                           for entry in check_in_entries]
             if output_text:
                 self.result_area.insert('end', ''.join(output_text))
             else:
                 self.result_area.insert('end', "No check-ins for today.")
 
 def main():
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Check-In System")
+    parser.add_argument('--scan', metavar='SOURCE', help="open scanner mode reading student ids from a file, pipe, or '-' for stdin")
+    args = parser.parse_args()
+
     app = CheckInApp()
+    if args.scan:
+        app.open_scanner_window(args.scan)
     app.mainloop()
 
 if __name__ == "__main__":